@@ -0,0 +1,69 @@
+##############
+# Name: core
+# Author: Naveen Srivatsav
+# Description: the pure logic of the renamer — text normalisation,
+# cache keys, year validation and filename synthesis. nothing in here
+# touches the filesystem, the network or OpenAI, so all of it can be
+# unit-tested (or even AOT-compiled) without an API key or sample PDFs.
+#############
+
+import hashlib
+import re
+import time
+
+# regexes compiled once at import instead of per call
+_FILENAME_RE = re.compile(r"[^\w\s()\-&]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+_ALREADY_NAMED_RE = re.compile(r".+ - .+ \(\d{4}\)\.pdf$", re.IGNORECASE)
+
+
+# does this filename already look like "Author - Title (YYYY).pdf"?
+# if so it was almost certainly produced by a previous run and there
+# is nothing for the LLM to add
+def is_already_named(filename: str) -> bool:
+    return _ALREADY_NAMED_RE.match(filename) is not None
+
+# how much of the first page we actually send to the model;
+# ~3000 chars is roughly 750 tokens
+MAX_RIP_TEXT_CHARS = 3000
+
+
+# title/author/year live in the top of the page, so squash the
+# newline-heavy PDF extract into single spaces and keep only the
+# first 3000 characters — every token we don't send is latency
+# and money saved
+def normalise_rip_text(rip_text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", rip_text).strip()[:MAX_RIP_TEXT_CHARS]
+
+
+# cache key for a (normalised) first-page extract; the model and
+# prompt version ride along so either changing invalidates old entries
+def guess_cache_key(rip_text: str, model: str, prompt_version: str) -> str:
+    return hashlib.sha256(f"{model}|{prompt_version}|{rip_text}".encode()).hexdigest()
+
+
+# the model is asked for a YYYY year but occasionally hands back
+# "2022-03", an int, or prose; fish out a plausible 4-digit year and
+# return "" when there isn't one so callers can degrade gracefully
+def coerce_year(value: object) -> str:
+    match = _YEAR_RE.search(str(value))
+    return match.group(0) if match else ""
+
+
+# builds the human-facing "Author - Title (Year)" string from the
+# model's guess, falling back to the raw pubdate when no clean year
+# could be extracted
+def synthesise_name(author: str, title: str, pubdate: object) -> str:
+    display_date = coerce_year(pubdate) or str(pubdate)
+    return f"{author} - {title} ({display_date})"
+
+
+# this function removes special characters and truncates
+# potential filenames to 200 characters
+def validate_and_trim_filename(initial_filename: str) -> str:
+    if not initial_filename:
+        timestamp = time.strftime('%Y%m%d%H%M%S', time.gmtime())
+        return f'empty_file_{timestamp}'
+
+    return _FILENAME_RE.sub('', initial_filename)[:200]
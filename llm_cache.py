@@ -0,0 +1,65 @@
+##############
+# Name: llm_cache
+# Author: Naveen Srivatsav
+# Description: tiny on-disk cache for OpenAI responses so re-running
+# the renamer over the same library doesn't pay for the same guesses twice.
+# keys are SHA-256 hashes of (model | prompt version | first-page text),
+# values are the raw JSON responses, stored in a SQLite file under
+# ~/.cache/pdf-renamer/ so it survives between runs.
+#############
+
+import os
+import sqlite3
+from datetime import datetime
+
+# the cache lives in the user's cache dir, not next to the PDFs,
+# so it is shared across every folder you point the script at
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf-renamer")
+CACHE_DB = os.path.join(CACHE_DIR, "responses.db")
+
+_connection = None
+
+# in-memory layer over the SQLite file: duplicate PDFs inside one run
+# (same first-page text) resolve from this dict without touching disk
+_memo = {}
+
+
+# open (and lazily create) the SQLite database on first use
+def _connect():
+    global _connection
+    if _connection is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _connection = sqlite3.connect(CACHE_DB)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "hash TEXT PRIMARY KEY, "
+            "model TEXT, "
+            "prompt_version TEXT, "
+            "response TEXT, "
+            "created_at TEXT)"
+        )
+        _connection.commit()
+    return _connection
+
+
+# look up a previous response by its hash key; None means cache miss
+def get(key):
+    if key in _memo:
+        return _memo[key]
+    conn = _connect()
+    row = conn.execute("SELECT response FROM responses WHERE hash = ?", (key,)).fetchone()
+    if row:
+        _memo[key] = row[0]
+        return row[0]
+    return None
+
+
+# remember a response so the next run gets it for free
+def set(key, model, prompt_version, response):
+    _memo[key] = response
+    conn = _connect()
+    conn.execute(
+        "INSERT OR REPLACE INTO responses (hash, model, prompt_version, response, created_at) VALUES (?, ?, ?, ?, ?)",
+        (key, model, prompt_version, response, datetime.utcnow().isoformat()),
+    )
+    conn.commit()
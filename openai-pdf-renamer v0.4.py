@@ -0,0 +1,726 @@
+##############
+# Name: openai-pdf-renamer
+# Author: Naveen Srivatsav
+# Version: 0.4
+# Description: This script takes a folder full of badly-named PDFs,
+# extracts text from the first page, sends that text to OpenAI
+# gets response in JSON format with title author and pubdate
+# and renames the files accordingly, also updating the metadata.
+# this version processes all the PDFs concurrently with asyncio
+# so the OpenAI round-trips overlap instead of queueing up
+#############
+
+
+# here are the libraries we will be using
+import os, time, json
+import argparse
+import asyncio
+import random
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import httpx
+from openai import APITimeoutError, AsyncOpenAI, RateLimitError
+from pydantic import BaseModel, ValidationError
+from PyPDF2 import PdfReader, PdfWriter
+from datetime import datetime
+
+import llm_cache
+from core import (
+    MAX_RIP_TEXT_CHARS,
+    coerce_year,
+    guess_cache_key as core_cache_key,
+    is_already_named,
+    normalise_rip_text,
+    synthesise_name,
+    validate_and_trim_filename,
+)
+
+# PyMuPDF (imported as fitz) is C-backed and rips a first page
+# an order of magnitude faster than PyPDF2; it is optional though,
+# we quietly fall back to PyPDF2 if it isn't installed
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+# one shared httpx client for every request: keep-alive connections are
+# reused across the whole run (no fresh ~100ms TLS handshake per call)
+# and HTTP/2 multiplexes the concurrent requests over fewer sockets.
+# HTTP/2 needs the optional h2 package (pip install httpx[http2]);
+# without it we still get the keep-alive pooling over HTTP/1.1
+try:
+    _http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        timeout=30.0,
+    )
+except ImportError:
+    _http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        timeout=30.0,
+    )
+
+# I like to call my AIs ChAI (Chat+AI) for short.
+# AsyncOpenAI instead of OpenAI so we can fire many requests at once
+chai = AsyncOpenAI(api_key=INSERT_YOUR_API_KEY_HERE, http_client=_http_client)
+
+# which model we ask and which revision of the prompt we are on;
+# both go into the cache key so editing the prompt (or switching
+# models) automatically invalidates the old cached guesses
+MODEL = "gpt-4o-mini"
+PROMPT_VERSION = "v0.6"
+
+
+# the shape we want every guess to come back in; handing this schema
+# to the Responses API means OpenAI enforces it server-side and we
+# don't need paragraphs of "strictly JSON please" in the prompt
+class BookMeta(BaseModel):
+    author: str
+    title: str
+    pubdate: str
+
+
+# batch variants: several PDFs ride in one request, each answer
+# carrying the id of the text it belongs to
+class BatchItem(BookMeta):
+    id: int
+
+
+class BatchResults(BaseModel):
+    results: list[BatchItem]
+
+
+# how many PDFs share one OpenAI request; one request carrying five
+# tasks beats five requests carrying one task each when the binding
+# limit is requests-per-minute. the system prompt is also only charged
+# once per group this way. overridable via PDF_RENAMER_BATCH_SIZE
+BATCH_SIZE = max(1, int(os.environ.get("PDF_RENAMER_BATCH_SIZE", "5")))
+
+# cap on how many OpenAI requests are in flight at the same time;
+# 10 is plenty to saturate the wait without tripping rate limits,
+# overridable via PDF_RENAMER_CONCURRENCY for bigger accounts
+MAX_CONCURRENCY = int(os.environ.get("PDF_RENAMER_CONCURRENCY", "10"))
+llm_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+# proactive token-bucket throttle so a burst of 50 files never slams
+# into OpenAI's requests-per-minute ceiling in the first place —
+# sitting just under the limit beats burning time in 429-retry cycles.
+# the bucket refills continuously at max_rate per time_period and each
+# request takes one token, sleeping until one is available
+class RateLimiter:
+    def __init__(self, max_rate, time_period=60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self.capacity = float(max_rate)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    # take `amount` tokens out of the bucket, sleeping until the
+    # continuous refill has made enough room
+    async def acquire(self, amount=1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.capacity = min(
+                    float(self.max_rate),
+                    self.capacity + (now - self.updated_at) * self.max_rate / self.time_period,
+                )
+                self.updated_at = now
+                if self.capacity >= amount:
+                    self.capacity -= amount
+                    return
+                await asyncio.sleep((amount - self.capacity) * self.time_period / self.max_rate)
+
+    async def __aenter__(self):
+        await self.acquire(1.0)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+# 500 requests and 200k tokens per minute match the usual tier for
+# gpt-4o-mini; tune to whatever your account's dashboard says
+RPM_LIMIT = 500
+TPM_LIMIT = 200_000
+rpm_limiter = RateLimiter(RPM_LIMIT)
+tpm_limiter = RateLimiter(TPM_LIMIT)
+
+
+# output budget per renaming task — used both as the max_tokens cap on
+# capped calls and as the output side of the TPM estimate, so the
+# throttle charges exactly what the API is allowed to spend
+OUTPUT_TOKENS_PER_TASK = 256
+
+
+# rough-and-ready token estimate for throttling purposes: ~4 chars per
+# token of prompt plus whatever we allow the model to generate
+def estimate_tokens(messages, output_cap=OUTPUT_TOKENS_PER_TASK):
+    return sum(len(m["content"]) for m in messages) // 4 + output_cap
+
+
+# how long to sleep before retrying a 429: exponential with jitter so
+# concurrent tasks don't all come back at the same instant
+def backoff_delay(attempt):
+    return 2 ** attempt + random.random()
+
+# separate worker pools for the two kinds of disk work, so PDFs keep
+# getting ripped and metadata keeps getting written while other files
+# are waiting on OpenAI — a producer-consumer pipeline where each stage
+# is sized for its own bottleneck (reads are cheap, writes hit disk).
+# fitz releases the GIL inside its C extraction path so threads scale;
+# the pure-Python PyPDF2 fallback doesn't, so without fitz the
+# extraction stage moves to worker processes and sidesteps the GIL
+if fitz is not None:
+    extract_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="extract")
+else:
+    extract_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+write_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="write")
+
+
+# run a blocking function in one of the dedicated pools without
+# blocking the event loop; partial (not a lambda) so the job can cross
+# a process boundary when the extract pool is process-backed
+def run_in_pool(pool, fn, *args):
+    return asyncio.get_running_loop().run_in_executor(pool, partial(fn, *args))
+
+# this function takes the LLM's guessed JSON for a PDF,
+# stamps the metadata into the file and returns the cleaned-up name;
+# the PDF writing itself stays synchronous but runs in the writer
+# pool so it doesn't block the event loop
+async def rename_pdf_based_on_title(pdf_path, llm_guessed_response):
+    if llm_guessed_response is None:
+        print(f"No guess for {pdf_path}, leaving it alone.")
+        return None
+
+    # structured outputs mean this parse should never fail for fresh
+    # responses, but Batch API output and old cache entries arrive as
+    # plain strings — valid JSON with a key missing is just as possible
+    # as broken JSON, so run the full schema over it; one malformed
+    # guess shouldn't take down the run
+    try:
+        guess = BookMeta.model_validate_json(llm_guessed_response)
+    except (ValidationError, TypeError) as e:
+        print(f"Unparseable guess for {pdf_path} ({e}), leaving it alone.")
+        return None
+    # a bad year shouldn't sink the whole rename: synthesise_name falls
+    # back to the raw value for display but only a spec-valid date is
+    # written into the PDF
+    clean_date = coerce_year(guess.pubdate)
+    guessed_name = synthesise_name(guess.author, guess.title, guess.pubdate)
+
+    clean_name=validate_and_trim_filename(guessed_name)
+    clean_author=validate_and_trim_filename(guess.author)
+    clean_title=validate_and_trim_filename(guess.title)
+
+    # rewrite metadata to the PDF (also blocking disk work -> writer pool)
+    await run_in_pool(write_pool, write_pdf_metadata, pdf_path, clean_title, clean_author, clean_date)
+
+    print(guessed_name)
+    return clean_name
+
+
+# this helper opens the PDF and rips text off the leading pages;
+# normally the first page is plenty, but sparse cover pages get topped
+# up from the next few pages. the loop stops the moment we have the
+# MAX_RIP_TEXT_CHARS the prompt will keep anyway — decoding pages the
+# truncation would throw away is pure wasted CPU.
+# PyMuPDF only parses the pages it touches; PyPDF2 remains the fallback
+MAX_EXTRACT_PAGES = 5
+
+
+def extract_first_page_text(pdf_path, target_chars=MAX_RIP_TEXT_CHARS):
+    if fitz is not None:
+        doc = fitz.open(pdf_path)
+        try:
+            text = ""
+            for page_number in range(min(MAX_EXTRACT_PAGES, doc.page_count)):
+                # minimal flags: the LLM doesn't care about ligatures,
+                # dehyphenation or embedded images, so skip those
+                # reconstruction passes entirely
+                text += doc.load_page(page_number).get_text(
+                    "text", flags=fitz.TEXT_PRESERVE_WHITESPACE
+                )
+                if len(text) >= target_chars:
+                    break
+            return text
+        finally:
+            doc.close()
+    reader = PdfReader(pdf_path)
+    text = ""
+    for page in reader.pages[:MAX_EXTRACT_PAGES]:
+        text += page.extract_text() or ""
+        if len(text) >= target_chars:
+            break
+    return text
+
+
+# this helper rewrites the title/author/date metadata into the PDF.
+# with PyMuPDF we do an incremental save, which appends a few KB of
+# updated objects to the file instead of re-encoding every page the
+# way the PyPDF2 path below has to; for a 300-page report that is
+# easily 100x less disk traffic. PyPDF2 full rewrite stays as fallback.
+# cheapest possible win on reruns: if the file already carries exactly
+# the metadata we were about to write, don't touch the disk at all
+# (--force overrides this)
+force_metadata = False
+
+# by default files already shaped like "Author - Title (YYYY).pdf" are
+# skipped wholesale — no rip, no LLM call, no rewrite. --rename-all
+# opts out for the rare case where an earlier guess was wrong
+skip_renamed = True
+
+
+def metadata_already_correct(existing, clean_title, clean_author, pdf_date):
+    if existing.get("title") != clean_title or existing.get("author") != clean_author:
+        return False
+    if pdf_date and not (existing.get("creationDate") or "").startswith(pdf_date[:6]):
+        return False
+    return True
+
+
+def write_pdf_metadata(pdf_path, clean_title, clean_author, clean_date):
+    # only a validated 4-digit year goes into the file, formatted per
+    # the PDF spec (D:YYYYMMDDHHmmSS); anything else is left out rather
+    # than stuffing garbage into /CreationDate
+    pdf_date = f"D:{clean_date}0101000000Z" if clean_date else None
+    if fitz is not None:
+        try:
+            doc = fitz.open(pdf_path)
+            # close in a finally so a failed save never leaks the handle
+            # into the PyPDF2 fallback below — os.replace on Windows
+            # refuses to swap a file this process still holds open
+            try:
+                if not force_metadata and metadata_already_correct(doc.metadata or {}, clean_title, clean_author, pdf_date):
+                    print(f"Metadata already correct for {pdf_path}, not rewriting.")
+                    return
+                new_metadata = {"title": clean_title, "author": clean_author}
+                if pdf_date:
+                    new_metadata["creationDate"] = pdf_date
+                doc.set_metadata(new_metadata)
+                # explicit incremental save, keeping whatever encryption the
+                # file already has — saveIncremental() chokes on documents
+                # where the encryption would need re-deciding
+                doc.save(pdf_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+                return
+            finally:
+                doc.close()
+        except Exception as e:
+            print(f"Incremental metadata save failed ({e}), falling back to full rewrite.")
+    reader = PdfReader(pdf_path)
+    existing = reader.metadata or {}
+    if not force_metadata and metadata_already_correct(
+        {"title": existing.get("/Title"), "author": existing.get("/Author"), "creationDate": existing.get("/CreationDate")},
+        clean_title, clean_author, pdf_date,
+    ):
+        print(f"Metadata already correct for {pdf_path}, not rewriting.")
+        return
+    # clone the already-parsed document instead of pushing every page
+    # through add_page again — the writer shares the reader's parsed
+    # objects by reference, so the xref is only built once
+    writer = PdfWriter()
+    writer.clone_document_from_reader(reader)
+    metadata = {
+        '/Title': clean_title,
+        '/Author': clean_author,
+    }
+    if pdf_date:
+        metadata['/CreationDate'] = pdf_date
+    writer.add_metadata(metadata)
+    # write the rewrite to a temp file and swap it in with os.replace,
+    # which is a single atomic syscall on POSIX and Windows — no window
+    # where a half-written PDF sits at the real path, no .bak to clean up
+    temp_pdf_path = pdf_path + ".tmp"
+    with open(temp_pdf_path, 'wb') as f:
+        writer.write(f)
+    os.replace(temp_pdf_path, pdf_path)
+
+
+# scanned PDFs often rip to almost nothing (whitespace plus a page
+# number); asking OpenAI about those just buys an "Unknown" we throw
+# away. 80 characters is comfortably enough to hold a title + author,
+# anything under that gets skipped and logged so the user can OCR it
+MIN_RIP_TEXT_CHARS = 80
+
+
+def has_enough_text(pdf_path, rip_text):
+    if rip_text is None or len(rip_text.strip()) < MIN_RIP_TEXT_CHARS:
+        print(f"Too little text; skipping {pdf_path}")
+        return False
+    return True
+
+
+# cache key for a (normalised) first-page extract, bound to the
+# current model and prompt revision
+def guess_cache_key(rip_text):
+    return core_cache_key(rip_text, MODEL, PROMPT_VERSION)
+
+
+# one terse system prompt shared by every call — these rules are resent
+# on each request, so every word here is a recurring token charge
+SYSTEM_PROMPT = (
+    "You are a librarian renaming documents for a library. Rules: "
+    "author is a notable institutional acronym, else First Author & etal, else Various; "
+    "title has no special symbols, Unknown if unguessable; "
+    "pubdate is the YYYY year first published, digits only; "
+    "Title Capitalisation throughout. "
+    "Example: A4S & Neil Gaiman & etal - A4S Guide to Incentivizing Action (2022)."
+)
+
+
+# the single-PDF prompt, shared by the live path and the Batch API path
+def build_guess_messages(rip_text):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f'Give author, title and pubdate for this text:\n----------\n"{rip_text}"'}
+    ]
+
+
+# batch flavour of llm_guess: ships up to BATCH_SIZE first-page
+# extracts in one request and gets a JSON array back, so five PDFs
+# cost one HTTP round-trip instead of five. texts that are already
+# in the cache don't get sent at all.
+# returns one response string (or None) per input, in the same order
+async def llm_guess_batch(rip_texts):
+    guesses = [None] * len(rip_texts)
+    pending = []
+    for i, rip_text in enumerate(rip_texts):
+        rip_text = normalise_rip_text(rip_text)
+        cached = llm_cache.get(guess_cache_key(rip_text))
+        if cached is not None:
+            print("(cache hit, skipping OpenAI)")
+            guesses[i] = cached
+        else:
+            pending.append((i, rip_text))
+
+    if not pending:
+        return guesses
+
+    payload = json.dumps([{"id": n, "text": rip_text} for n, (_, rip_text) in enumerate(pending)])
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": (
+            'Give author, title and pubdate for each text, echoing back its id. '
+            'Respond only in JSON shaped like '
+            '{"results": [{"id": 0, "author": "...", "title": "...", "pubdate": "YYYY"}]}.\n'
+            '----------\n' + payload
+        )}
+    ]
+    try:
+        # stream the response so we start consuming at the first token
+        # and can hang up the moment the top-level JSON object closes,
+        # instead of waiting out whatever the model tacks on the end.
+        # 429s get exponential backoff with jitter before another go
+        for attempt in range(3):
+            buffer = ""
+            depth = 0
+            started = False
+            try:
+                async with llm_semaphore, rpm_limiter:
+                    await tpm_limiter.acquire(estimate_tokens(messages, output_cap=OUTPUT_TOKENS_PER_TASK * len(pending)))
+                    stream = await chai.chat.completions.create(
+                        model=MODEL,
+                        response_format={"type": "json_object"},
+                        stream=True,
+                        # generous cap: ~256 tokens per task never
+                        # truncates mid-JSON (which costs a full retry)
+                        # yet still bounds a runaway generation; pinned
+                        # sampling keeps cache hits deterministic
+                        max_tokens=OUTPUT_TOKENS_PER_TASK * len(pending),
+                        temperature=0,
+                        seed=0,
+                        messages=messages,
+                    )
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content or ""
+                        buffer += delta
+                        for char in delta:
+                            if char == "{":
+                                depth += 1
+                                started = True
+                            elif char == "}":
+                                depth -= 1
+                        if started and depth == 0:
+                            await stream.close()
+                            break
+                break
+            except (RateLimitError, APITimeoutError):
+                if attempt == 2:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+        for item in BatchResults.model_validate_json(buffer).results:
+            if 0 <= item.id < len(pending):
+                i, rip_text = pending[item.id]
+                output_text = BookMeta(author=item.author, title=item.title, pubdate=item.pubdate).model_dump_json()
+                llm_cache.set(guess_cache_key(rip_text), MODEL, PROMPT_VERSION, output_text)
+                guesses[i] = output_text
+    except Exception as e:
+        print({e})
+
+    # anything the batch response forgot gets one individual retry
+    for i, rip_text in pending:
+        if guesses[i] is None:
+            guesses[i] = await llm_guess(rip_text)
+    return guesses
+
+
+# this function sends the first page extract to OpenAI
+# and gives specific instructions on how to format the results
+# (good enough for me)
+# but you can easily change the instructions here.
+# the semaphore caps how many requests are in flight at once
+# before calling out we check the on-disk cache: if we have seen this
+# exact first page before (same model, same prompt) the answer is free
+async def llm_guess(rip_text):
+    rip_text = normalise_rip_text(rip_text)
+    cache_key = guess_cache_key(rip_text)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        print("(cache hit, skipping OpenAI)")
+        return cached
+    messages = build_guess_messages(rip_text)
+    try:
+        # up to 2 retries where we feed the validation error back to the
+        # model and ask it to fix its own output
+        for attempt in range(3):
+            try:
+                async with llm_semaphore, rpm_limiter:
+                    await tpm_limiter.acquire(estimate_tokens(messages))
+                    response = await chai.responses.parse(
+                        model=MODEL,
+                        input=messages,
+                        text_format=BookMeta,
+                        # no output cap: the schema already bounds the
+                        # response, and a cap can truncate mid-JSON and
+                        # waste a whole retry
+                        temperature=0,
+                    )
+                break
+            except (RateLimitError, APITimeoutError):
+                # over quota: wait it out, nothing to feed back
+                if attempt == 2:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+            except Exception as e:
+                if attempt == 2:
+                    raise
+                messages.append({"role": "user", "content": f"Your output had error: {e}. Fix and retry."})
+
+        output_text = response.output_parsed.model_dump_json()
+        #print(output_text)
+        llm_cache.set(cache_key, MODEL, PROMPT_VERSION, output_text)
+        return output_text
+    except Exception as e:
+        print({e})
+        return None
+
+# this coroutine handles one PDF end-to-end:
+# guesses the new name and then does the actual renaming.
+# existing_names is the shared set of filenames already in the
+# directory — collision checks are in-memory set lookups instead of
+# one os.listdir per file, which was O(N^2) across a run
+async def process_one_pdf(directory, filepath, llm_guessed_response, existing_names):
+    new_file_name = await rename_pdf_based_on_title(filepath, llm_guessed_response)
+    if new_file_name is None:
+        return
+    if not new_file_name.endswith(".pdf"):
+        new_file_name = new_file_name + ".pdf"
+    else:
+        print("already a PDF")
+
+    # the guess can legitimately reproduce the file's current name;
+    # that's not a collision, just nothing to do
+    if new_file_name == os.path.basename(filepath):
+        print(f"{filepath} already has the right name.")
+        return
+
+    if new_file_name in existing_names:
+        print(f"The new filename '{new_file_name}' already exists.")
+        base, ext = os.path.splitext(new_file_name)
+        counter = 1
+        while f"{base}_{counter:02d}{ext}" in existing_names:
+            counter += 1
+        new_file_name = f"{base}_{counter:02d}{ext}"
+
+    new_filepath = os.path.join(directory, new_file_name)
+    try:
+        os.rename(filepath, new_filepath)
+        existing_names.add(new_file_name)
+        existing_names.discard(os.path.basename(filepath))
+        print(f"File renamed to {new_filepath}")
+    except Exception as e:
+        print(f"An error occurred while renaming the file: {e}")
+
+# this is the primary function that detects PDFs in a directory
+# and fans them all out to process_one_pdf at the same time;
+# asyncio.gather means a folder of N PDFs takes roughly
+# N/MAX_CONCURRENCY round-trips instead of N
+# walks the directory and returns the PDF paths, newest first.
+# os.scandir hands back DirEntry objects whose stat() is cached,
+# so sorting by mtime costs one stat per file instead of one per
+# comparison like os.path.getmtime in a sort key would
+def scan_pdf_paths(directory):
+    # decorate-sort: pull the cached mtime into plain tuples while the
+    # scandir handles are hot, so the sort is pure tuple comparison —
+    # no key lambda, no DirEntry method calls per element
+    with os.scandir(directory) as it:
+        entries = [
+            (e.stat().st_mtime, e.name, e.path)
+            for e in it
+            if e.is_file() and e.name.lower().endswith(".pdf")
+        ]
+    entries.sort(reverse=True)
+    # files already shaped like "Author - Title (YYYY).pdf" were done by
+    # a previous run — skip them before we even rip their text, which
+    # makes re-runs over a mostly-processed library near-free
+    # (--rename-all puts them back on the table)
+    paths = []
+    for _, name, path in entries:
+        if skip_renamed and is_already_named(name):
+            print(f"Already well-named, skipping {path}")
+        else:
+            paths.append(path)
+    return paths
+
+async def rename_pdfs_in_directory(directory):
+    paths = scan_pdf_paths(directory)
+    for path in paths:
+        print(f"Found file {path}")
+
+    # rip all the first pages concurrently in worker threads
+    rip_texts = await asyncio.gather(*[run_in_pool(extract_pool, extract_first_page_text, p) for p in paths])
+    print("Processing...")
+
+    # don't bother OpenAI about scanned/empty PDFs
+    keep = [(p, t) for p, t in zip(paths, rip_texts) if has_enough_text(p, t)]
+    paths = [p for p, _ in keep]
+    rip_texts = [t for _, t in keep]
+
+    # then ask OpenAI about BATCH_SIZE PDFs per request; the chunks
+    # themselves still run concurrently under the semaphore
+    existing_names = {os.path.basename(p) for p in paths} | set(os.listdir(directory))
+
+    async def process_chunk(chunk_paths, chunk_texts):
+        guesses = await llm_guess_batch(chunk_texts)
+        await asyncio.gather(*[
+            process_one_pdf(directory, p, g, existing_names) for p, g in zip(chunk_paths, guesses)
+        ])
+
+    tasks = []
+    for start in range(0, len(paths), BATCH_SIZE):
+        stop = start + BATCH_SIZE
+        tasks.append(process_chunk(paths[start:stop], rip_texts[start:stop]))
+    await asyncio.gather(*tasks)
+
+# the slow-but-half-price route: submit every prompt as one OpenAI
+# Batch API job and come back when it's done. no rate-limit stalls,
+# tokens cost ~50% of the live price, but turnaround can be up to 24h —
+# perfect for "point it at the library overnight" runs (--batch flag)
+async def rename_pdfs_with_batch_api(directory):
+    paths = scan_pdf_paths(directory)
+    for path in paths:
+        print(f"Found file {path}")
+
+    rip_texts = await asyncio.gather(*[run_in_pool(extract_pool, extract_first_page_text, p) for p in paths])
+
+    # don't bother OpenAI about scanned/empty PDFs
+    keep = [(p, t) for p, t in zip(paths, rip_texts) if has_enough_text(p, t)]
+    paths = [p for p, _ in keep]
+    rip_texts = [normalise_rip_text(t) for _, t in keep]
+
+    # cached guesses don't need to ride along in the batch job
+    guesses = {}
+    lines = []
+    for path, rip_text in zip(paths, rip_texts):
+        cached = llm_cache.get(guess_cache_key(rip_text))
+        if cached is not None:
+            print("(cache hit, skipping OpenAI)")
+            guesses[path] = cached
+        else:
+            messages = build_guess_messages(rip_text)
+            messages[0]["content"] += " Respond only in JSON with author, title and pubdate string values."
+            lines.append(json.dumps({
+                "custom_id": path,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": MODEL,
+                    "response_format": {"type": "json_object"},
+                    "max_tokens": OUTPUT_TOKENS_PER_TASK,
+                    "temperature": 0,
+                    "seed": 0,
+                    "messages": messages,
+                },
+            }))
+
+    if lines:
+        batch_input_path = os.path.join(directory, "batch_input.jsonl")
+        with open(batch_input_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        with open(batch_input_path, "rb") as f:
+            batch_file = await chai.files.create(file=f, purpose="batch")
+        batch = await chai.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        print(f"Submitted batch {batch.id} with {len(lines)} PDFs, polling until it completes...")
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(30)
+            batch = await chai.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            if counts is not None:
+                print(f"Batch {batch.status}: {counts.completed}/{counts.total} done, {counts.failed} failed")
+        os.remove(batch_input_path)
+        if batch.status != "completed":
+            print(f"Batch finished with status '{batch.status}', nothing renamed.")
+            return
+
+        # map the answers back to their files via custom_id
+        output = await chai.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            result = json.loads(line)
+            body = result["response"]["body"]
+            output_text = body["choices"][0]["message"]["content"].strip()
+            path = result["custom_id"]
+            guesses[path] = output_text
+            rip_text = rip_texts[paths.index(path)]
+            llm_cache.set(guess_cache_key(rip_text), MODEL, PROMPT_VERSION, output_text)
+
+    existing_names = {os.path.basename(p) for p in paths} | set(os.listdir(directory))
+    for path in paths:
+        await process_one_pdf(directory, path, guesses.get(path), existing_names)
+
+
+# this is the MAIN function;
+# you can input a dedicated folder-path to process
+# when you run the script or else
+# it will ask you to manually input the path otherwise
+def main():
+    parser = argparse.ArgumentParser(description="Rename badly-named PDFs with a little help from OpenAI.")
+    parser.add_argument("directory", nargs="?", default='', help="folder of PDFs to process")
+    parser.add_argument("--batch", action="store_true",
+                        help="submit one Batch API job (50%% cheaper, up to 24h turnaround) instead of live calls")
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite metadata even when the file already carries the right values")
+    parser.add_argument("--rename-all", action="store_true",
+                        help="also reprocess files that already look like 'Author - Title (YYYY).pdf'")
+    args = parser.parse_args()
+    global force_metadata, skip_renamed
+    force_metadata = args.force
+    skip_renamed = not args.rename_all
+    directory = args.directory
+    if directory == '':
+      directory = input("Please input your path:")
+    if args.batch:
+        asyncio.run(rename_pdfs_with_batch_api(directory))
+    else:
+        asyncio.run(rename_pdfs_in_directory(directory))
+    print("Finished processing!")
+
+
+if __name__ == "__main__":
+    main()